@@ -1,5 +1,6 @@
 import sys
 import os
+import gzip
 from io import BytesIO
 from datetime import timedelta
 
@@ -13,6 +14,12 @@ try:
 except Exception:
     load_config = None
 
+from src.data_loader import write_shared_dataset, load_shared_dataset
+from src.data_loader import read_csv_safely as read_csv_uncached
+from src.order_sketches import (
+    DEFAULT_ERROR, precision_for_error, build_order_sketches, estimate_distinct_orders
+)
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -39,6 +46,20 @@ try:
 except Exception:
     reportlab_available = False
 
+# Try to import pyarrow for Parquet export
+parquet_available = True
+try:
+    import pyarrow  # noqa: F401
+except Exception:
+    parquet_available = False
+
+# Try to import xlsxwriter for Excel export
+excel_available = True
+try:
+    import xlsxwriter  # noqa: F401
+except Exception:
+    excel_available = False
+
 # -----------------------
 # Utilities / Data Load
 # -----------------------
@@ -58,35 +79,80 @@ def read_csv_safely(file_path: str) -> pd.DataFrame:
                 detected_encoding = result.get('encoding', 'utf-8')
             return pd.read_csv(file_path, encoding=detected_encoding)
 
+def preprocess_dashboard_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parse dates, add Month/Year/Month_Name and coerce the numeric columns.
+
+    Works on `df` in place (no defensive copy), so callers must pass a frame they own.
+    """
+    df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
+    df = df.dropna(subset=['Order Date'])
+    df['Month'] = df['Order Date'].dt.month
+    df['Year'] = df['Order Date'].dt.year
+    df['Month_Name'] = df['Order Date'].dt.strftime('%b')
+    months_order = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+    df['Month_Name'] = pd.Categorical(df['Month_Name'], categories=months_order, ordered=True)
+
+    # Ensure numeric columns
+    for col in ['Sales','Profit','Quantity','Discount']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    return df
+
+# st.cache_resource (not cache_data) so sessions get the mapped frame itself rather than
+# a pickled copy; the frame must therefore never be mutated in place. `data_version`
+# (the source mtime) is part of the key, so a refreshed CSV is re-exported and remapped;
+# max_entries=1 drops the old mapping.
+@st.cache_resource(show_spinner=True, max_entries=1)
+def load_shared_frame(csv_path: str, shared_path: str, data_version) -> pd.DataFrame:
+    """Write the preprocessed Arrow file if missing/stale, then memory-map it."""
+    # The CSV may not be deployed at all when only the shared file is shipped
+    stale = not os.path.exists(shared_path) or (
+        os.path.exists(csv_path) and os.path.getmtime(shared_path) < os.path.getmtime(csv_path)
+    )
+    if stale:
+        # Uncached reader: a cached parse would keep a private copy of the CSV in this process
+        write_shared_dataset(preprocess_dashboard_df(read_csv_uncached(csv_path)), shared_path)
+    return load_shared_dataset(shared_path)
+
+# st.cache_resource: the sketch table is read-only and about as long as the data,
+# so sessions share it instead of unpickling a copy on every rerun.
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_order_sketches(_df_input: pd.DataFrame, data_key: tuple, precision: int) -> pd.DataFrame:
+    """Per (day, Region, Category) Order ID sketches; `data_key` (path, mtime) stands in for hashing the frame."""
+    return build_order_sketches(_df_input, precision)
+
 # -----------------------
 # Config / Load Data
 # -----------------------
 st.set_page_config(page_title="Sales Data Analysis Dashboard ", layout="wide")
 
+config = {}
+if load_config is not None:
+    try:
+        config = load_config(os.path.join(project_root, "config.yaml")) or {}
+    except Exception:
+        config = {}
+
 st.title(" Sales Data Analysis ")
 
 # Load dataset (ensure path is correct relative to project root)
 DATA_PATH = os.path.join(project_root, "data", "superstore.csv")
+# Shared mode: every worker/session memory-maps one preprocessed Arrow file
+SHARED_DATASET = bool(config.get('SHARED_DATASET', False))
+SHARED_DATASET_PATH = os.path.join(project_root, config.get('SHARED_DATASET_PATH', "data/superstore.feather"))
+# Data identity shared by the frame and sketch caches, so both refresh together
+DATA_SOURCE = SHARED_DATASET_PATH if SHARED_DATASET and not os.path.exists(DATA_PATH) else DATA_PATH
+DATA_VERSION = os.path.getmtime(DATA_SOURCE) if os.path.exists(DATA_SOURCE) else None
 try:
-    df = read_csv_safely(DATA_PATH)
+    if SHARED_DATASET:
+        df = load_shared_frame(DATA_PATH, SHARED_DATASET_PATH, DATA_VERSION)
+    else:
+        df = preprocess_dashboard_df(read_csv_safely(DATA_PATH))
 except Exception as e:
     st.error(f"Failed to load data: {e}")
     st.stop()
 
-# Basic preprocessing
-df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
-df = df.dropna(subset=['Order Date'])
-df['Month'] = df['Order Date'].dt.month
-df['Year'] = df['Order Date'].dt.year
-df['Month_Name'] = df['Order Date'].dt.strftime('%b')
-months_order = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-df['Month_Name'] = pd.Categorical(df['Month_Name'], categories=months_order, ordered=True)
-
-# Ensure numeric columns
-for col in ['Sales','Profit','Quantity','Discount']:
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
 # -----------------------
 # Sidebar: Filters
 # -----------------------
@@ -103,6 +169,10 @@ start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[
 regions = st.sidebar.multiselect("Region(s)", sorted(df['Region'].dropna().unique()), default=sorted(df['Region'].dropna().unique()))
 categories = st.sidebar.multiselect("Category(ies)", sorted(df['Category'].dropna().unique()), default=sorted(df['Category'].dropna().unique()))
 compare_by = st.sidebar.selectbox("Comparison dimension", options=["Region","Category"])
+exact_orders = st.sidebar.checkbox(
+    "Exact order counts", value=bool(config.get('ORDER_SKETCH_EXACT', False)),
+    help="Count distinct Order IDs over the raw rows instead of merging pre-built sketches.",
+)
 
 # Apply filters
 filtered_df = df[
@@ -122,13 +192,30 @@ if filtered_df.empty:
 st.markdown("##  Key Performance Indicators (Filtered)")
 total_sales = filtered_df['Sales'].sum()
 total_profit = filtered_df['Profit'].sum()
-total_orders = filtered_df['Order ID'].nunique() if 'Order ID' in filtered_df.columns else len(filtered_df)
+# Distinct orders can't be pre-summed, so they come from merged HyperLogLog
+# sketches (approximate, within ORDER_SKETCH_ERROR) unless exact mode is on.
+use_sketches = 'Order ID' in df.columns and not exact_orders
+if use_sketches:
+    data_key = (DATA_SOURCE, DATA_VERSION)
+    order_sketches = load_order_sketches(
+        df, data_key, precision_for_error(config.get('ORDER_SKETCH_ERROR', DEFAULT_ERROR))
+    )
+
+def count_orders(data: pd.DataFrame, date_from, date_to, region_filter, category_filter) -> int:
+    """Distinct orders for the filters; `data` must be the rows matching them (used in exact mode)."""
+    if use_sketches:
+        return estimate_distinct_orders(
+            order_sketches, date_from, date_to, Region=region_filter, Category=category_filter
+        )
+    return data['Order ID'].nunique() if 'Order ID' in data.columns else len(data)
+
+total_orders = count_orders(filtered_df, start_date, end_date, regions, categories)
 avg_profit_margin = (total_profit / total_sales * 100) if total_sales != 0 else 0
 
 k1, k2, k3, k4 = st.columns(4)
 k1.metric("🛒 Total Sales", f"${total_sales:,.0f}")
 k2.metric("💰 Total Profit", f"${total_profit:,.0f}")
-k3.metric("📦 Total Orders", f"{total_orders}")
+k3.metric("📦 Total Orders" + (" (≈)" if use_sketches else ""), f"{total_orders}")
 k4.metric("📈 Avg Profit Margin", f"{avg_profit_margin:.2f}%")
 
 # -----------------------
@@ -195,13 +282,13 @@ region_df = filtered_df[filtered_df['Region'] == primary_region].copy()
 # region KPIs
 r_sales = region_df['Sales'].sum()
 r_profit = region_df['Profit'].sum()
-r_orders = region_df['Order ID'].nunique() if 'Order ID' in region_df.columns else len(region_df)
+r_orders = count_orders(region_df, start_date, end_date, [primary_region], categories)
 r_margin = (r_profit / r_sales * 100) if r_sales != 0 else 0
 
 rc1, rc2, rc3, rc4 = st.columns(4)
 rc1.metric(f"🛒 Total Sales ({primary_region})", f"${r_sales:,.0f}")
 rc2.metric(f"💰 Total Profit ({primary_region})", f"${r_profit:,.0f}")
-rc3.metric(f"📦 Total Orders ({primary_region})", f"{r_orders}")
+rc3.metric(f"📦 Total Orders ({primary_region})" + (" (≈)" if use_sketches else ""), f"{r_orders}")
 rc4.metric(f"📈 Avg Profit Margin ({primary_region})", f"{r_margin:.2f}%")
 
 # Regional charts with insights
@@ -290,9 +377,40 @@ st.markdown("---")
 # -----------------------
 st.markdown("## 📤 Export & Reports")
 
-# CSV / Excel download
-csv_bytes = filtered_df.to_csv(index=False).encode('utf-8')
-st.download_button("📥 Download Filtered Data (CSV)", data=csv_bytes, file_name="filtered_sales.csv", mime="text/csv")
+# Exports are only serialised when the user asks for one, and the result is
+# cached per filter state so reruns (and repeat downloads) don't rebuild it.
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_FORMATS = {
+    "CSV": ("filtered_sales.csv", "text/csv"),
+    "CSV (gzip)": ("filtered_sales.csv.gz", "application/gzip"),
+    "Parquet": ("filtered_sales.parquet", "application/vnd.apache.parquet"),
+    "Excel": ("filtered_sales.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Summary Report (PDF)": ("sales_summary.pdf", "application/pdf"),
+}
+filter_key = (
+    str(start_date.date()), str(end_date.date()),
+    tuple(sorted(regions)), tuple(sorted(categories)),
+)
+
+def iter_csv_chunks(df_input: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield the frame as UTF-8 CSV bytes, `chunk_rows` rows at a time (header on the first chunk)."""
+    for start in range(0, len(df_input), chunk_rows):
+        chunk = df_input.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=(start == 0)).encode('utf-8')
+
+def to_csv_bytes(df_input: pd.DataFrame, compress: bool = False) -> bytes:
+    output = BytesIO()
+    stream = gzip.GzipFile(fileobj=output, mode='wb') if compress else output
+    for chunk in iter_csv_chunks(df_input):
+        stream.write(chunk)
+    if compress:
+        stream.close()
+    return output.getvalue()
+
+def to_parquet_bytes(df_input: pd.DataFrame) -> bytes:
+    output = BytesIO()
+    df_input.to_parquet(output, index=False, compression='snappy')
+    return output.getvalue()
 
 # Excel (xlsx) using BytesIO
 def to_excel_bytes(df_input: pd.DataFrame) -> bytes:
@@ -301,9 +419,6 @@ def to_excel_bytes(df_input: pd.DataFrame) -> bytes:
         df_input.to_excel(writer, index=False, sheet_name='Sales')
     return output.getvalue()
 
-xlsx_data = to_excel_bytes(filtered_df)
-st.download_button("📥 Download Filtered Data (Excel)", data=xlsx_data, file_name="filtered_sales.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
 # PDF summary generation
 def create_pdf_summary_bytes():
     output = BytesIO()
@@ -344,8 +459,38 @@ def create_pdf_summary_bytes():
         output.seek(0)
         return output.read()
 
-pdf_bytes = create_pdf_summary_bytes()
-st.download_button("📥 Download Summary Report (PDF)", data=pdf_bytes, file_name="sales_summary.pdf", mime="application/pdf")
+@st.cache_data(show_spinner="Preparing export...", max_entries=8)
+def build_export(_df_input: pd.DataFrame, export_format: str, cache_key: tuple) -> bytes:
+    """Serialise the filtered data; `cache_key` (the filter state) stands in for hashing the frame."""
+    if export_format == "CSV":
+        return to_csv_bytes(_df_input)
+    if export_format == "CSV (gzip)":
+        return to_csv_bytes(_df_input, compress=True)
+    if export_format == "Parquet":
+        return to_parquet_bytes(_df_input)
+    if export_format == "Excel":
+        return to_excel_bytes(_df_input)
+    return create_pdf_summary_bytes()
+
+unavailable_formats = {"Parquet": not parquet_available, "Excel": not excel_available}
+export_formats = [f for f in EXPORT_FORMATS if not unavailable_formats.get(f, False)]
+ecol1, ecol2 = st.columns([3, 1])
+export_format = ecol1.selectbox(
+    "Export format", options=export_formats,
+    help="Compressed CSV and Parquet are much smaller and faster to build than Excel for large extracts.",
+)
+if ecol2.button("Prepare export"):
+    st.session_state['export_request'] = (export_format, filter_key)
+
+# Only offer the download once it was requested for the current filters
+if st.session_state.get('export_request') == (export_format, filter_key):
+    file_name, mime = EXPORT_FORMATS[export_format]
+    try:
+        export_bytes = build_export(filtered_df, export_format, filter_key)
+    except Exception as e:
+        st.error(f"Export failed: {e}")
+    else:
+        st.download_button(f"📥 Download {export_format}", data=export_bytes, file_name=file_name, mime=mime)
 
 st.markdown("---")
 
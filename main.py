@@ -65,7 +65,10 @@ def main():
     model, forecast, metrics = prophet_predict(
         df_ts=df_ts, 
         forecast_days=config.get('FORECAST_PERIOD_DAYS', 90), # Read from config
-        test_size_months=config.get('TEST_SIZE_MONTHS', 12)    # Read from config
+        test_size_months=config.get('TEST_SIZE_MONTHS', 12),   # Read from config
+        model_dir=config.get('MODEL_OUTPUT_DIR'),
+        warm_start=config.get('WARM_START', False),
+        drift_tolerance=config.get('DRIFT_TOLERANCE', 0.25)
     )
     
     # Optional: Save forecast plot for reporting purposes
@@ -3,6 +3,14 @@ import streamlit as st
 import chardet
 import os
 
+# Optional: pyarrow is only needed for the shared (memory-mapped) dataset mode
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
 # Function 1: Robust CSV Reader (similar to your original main.py/app.py logic)
 def read_csv_safely(file_path):
     """
@@ -44,3 +52,40 @@ def load_raw_data(config):
     
     print(f"Data loaded successfully from {data_path}. Shape: {df.shape}")
     return df
+
+# Function 3: Shared, memory-mapped dataset (one physical copy per host)
+def write_shared_dataset(df, shared_path):
+    """
+    Writes the preprocessed DataFrame once as an uncompressed Arrow IPC (Feather v2) file.
+
+    The file is written to a temporary name and moved into place, so worker
+    processes racing to create it never map a partially written file.
+    Compression is disabled because compressed buffers cannot be memory-mapped.
+    """
+    if feather is None:
+        raise ImportError("pyarrow is required for the shared dataset mode")
+    os.makedirs(os.path.dirname(shared_path) or '.', exist_ok=True)
+    tmp_path = f"{shared_path}.{os.getpid()}.tmp"
+    feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+    os.replace(tmp_path, shared_path)
+    print(f"Shared dataset written to {shared_path}. Shape: {df.shape}")
+
+def _arrow_backed_strings(arrow_type):
+    # Keep string columns inside the mapped Arrow buffers instead of copying them into Python objects
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+def load_shared_dataset(shared_path):
+    """
+    Memory-maps a dataset written by `write_shared_dataset`.
+
+    Numeric/datetime columns without nulls and all string columns stay backed by the
+    mapped file, so every process on the host shares the same OS page-cache pages.
+    """
+    if feather is None:
+        raise ImportError("pyarrow is required for the shared dataset mode")
+    if not os.path.exists(shared_path):
+        raise FileNotFoundError(f"Shared dataset not found at: {shared_path}")
+    table = feather.read_table(shared_path, memory_map=True)
+    return table.to_pandas(split_blocks=True, types_mapper=_arrow_backed_strings)
@@ -1,8 +1,12 @@
 from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go 
+import json
+import os
+import time
 
 # --- 1. Model Evaluation Function ----
 
@@ -19,9 +23,93 @@ def evaluate_model(y_true, y_pred, model_name="Prophet"):
     
     return {"MAE": round(mae, 2), "RMSE": round(rmse, 2)}
 
-# --- 2. Prophet Prediction Function ---
+# --- 2. Warm-Start Helpers (incremental refits) ---
 
-def prophet_predict(df_ts, forecast_days, test_size_months, seasonality_mode='additive'):
+# Warm starts are meant for a history that grew incrementally; past this factor
+# (relative to the last cold fit's training rows) a cold fit is used instead.
+MAX_WARM_START_GROWTH = 2.0
+
+def warm_start_params(model):
+    """
+    Extracts the fitted parameters of a Prophet model in the form accepted by
+    `Prophet.fit(..., init=...)`, so a refit starts from the previous optimum.
+    """
+    params = {}
+    for pname in ['k', 'm', 'sigma_obs']:
+        params[pname] = model.params[pname][0][0]
+    for pname in ['delta', 'beta']:
+        params[pname] = model.params[pname][0]
+    return params
+
+def _model_paths(model_dir, model_name):
+    return (os.path.join(model_dir, f"{model_name}.json"),
+            os.path.join(model_dir, f"{model_name}_meta.json"))
+
+def load_previous_model(model_dir, model_name='prophet_model'):
+    """
+    Loads the previously saved model and its metadata from `model_dir`.
+
+    Returns:
+        tuple: (model, meta) or (None, {}) if no saved model exists.
+    """
+    model_path, meta_path = _model_paths(model_dir, model_name)
+    if not os.path.exists(model_path):
+        return None, {}
+    with open(model_path, 'r') as f:
+        model = model_from_json(f.read())
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    return model, meta
+
+def _write_atomic(path, text):
+    # Temp file + os.replace, so a crash mid-write never leaves a truncated file behind
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def save_model(model, meta, model_dir, model_name='prophet_model'):
+    """Saves the fitted model and its metadata (fit times, metrics) to `model_dir`."""
+    os.makedirs(model_dir, exist_ok=True)
+    model_path, meta_path = _model_paths(model_dir, model_name)
+    _write_atomic(model_path, model_to_json(model))
+    _write_atomic(meta_path, json.dumps(meta, indent=2))
+
+def _params_finite(model):
+    """Sanity check only: rejects fits whose parameters contain NaN/inf."""
+    return all(np.all(np.isfinite(np.asarray(value))) for value in model.params.values())
+
+def train_rmse(model, train_df):
+    """
+    In-sample RMSE of a fitted model, used to judge whether a warm-started fit reached
+    an optimum as good as the cold fit's. Uncertainty sampling is skipped to keep it cheap.
+    """
+    samples = model.uncertainty_samples
+    model.uncertainty_samples = 0
+    try:
+        fitted = model.predict(train_df[['ds']])
+    finally:
+        model.uncertainty_samples = samples
+    return float(np.sqrt(mean_squared_error(train_df['y'], fitted['yhat'])))
+
+# --- 3. Prophet Prediction Function ---
+
+def _new_model(seasonality_mode):
+    return Prophet(
+        yearly_seasonality=True,
+        weekly_seasonality=False, # Assuming data is aggregated weekly/monthly, adjust if daily
+        seasonality_mode=seasonality_mode
+    )
+
+def _fit_timed(model, train_df):
+    start = time.perf_counter()
+    model.fit(train_df)
+    return time.perf_counter() - start
+
+def prophet_predict(df_ts, forecast_days, test_size_months, seasonality_mode='additive',
+                    model_dir=None, warm_start=False, drift_tolerance=0.25, model_name='prophet_model'):
     """
     Trains and evaluates a Prophet model, then forecasts future sales.
     
@@ -29,6 +117,12 @@ def prophet_predict(df_ts, forecast_days, test_size_months, seasonality_mode='ad
         df_ts (pd.DataFrame): Data in the Prophet 'ds' (datetime) and 'y' (sales) format.
         forecast_days (int): Number of days to forecast into the future.
         test_size_months (int): Number of historical months to reserve for model testing.
+        model_dir (str): Directory where the fitted model is saved (e.g. MODEL_OUTPUT_DIR).
+        warm_start (bool): Initialise the optimiser from the model saved in `model_dir`.
+            Falls back to a cold fit if the warm fit fails, there is no cold-fit reference,
+            or its training RMSE or test MAE is more than `drift_tolerance` above the last
+            cold fit's.
+        model_name (str): File name stem, so several segment models can share `model_dir`.
     
     Returns:
         tuple: (fitted_model, forecast_df, metrics)
@@ -45,20 +139,101 @@ def prophet_predict(df_ts, forecast_days, test_size_months, seasonality_mode='ad
         train_df = df_ts.copy()
         test_df = pd.DataFrame() 
 
-    # 2. Model Initialization and Training
-    model = Prophet(
-        yearly_seasonality=True,
-        weekly_seasonality=False, # Assuming data is aggregated weekly/monthly, adjust if daily
-        seasonality_mode=seasonality_mode
-    )
-    
-    model.fit(train_df)
-    
-    # 3. Evaluation (only if test data exists)
-    metrics = {"MAE": None, "RMSE": None}
-    if not test_df.empty:
-        forecast_test = model.predict(test_df[['ds']])
-        metrics = evaluate_model(test_df['y'], forecast_test['yhat'])
+    def _evaluate(fitted):
+        if test_df.empty:
+            return {"MAE": None, "RMSE": None}
+        forecast_test = fitted.predict(test_df[['ds']])
+        return evaluate_model(test_df['y'], forecast_test['yhat'])
+
+    # 2. Model Initialization and Training (warm start from the previous fit if possible)
+    previous_model, meta = None, {}
+    if warm_start and model_dir:
+        try:
+            previous_model, meta = load_previous_model(model_dir, model_name)
+        except Exception as e:
+            # A truncated or version-incompatible file counts as "no previous model"
+            print(f"Could not load the previous model ({e}). Using a cold fit.")
+            previous_model, meta = None, {}
+        if previous_model is not None and meta.get('seasonality_mode', seasonality_mode) != seasonality_mode:
+            previous_model = None
+        cold_rows = meta.get('cold_fit_rows')
+        if previous_model is not None and cold_rows and len(train_df) > cold_rows * MAX_WARM_START_GROWTH:
+            print(f"History grew from {cold_rows} to {len(train_df)} rows since the last cold fit. Using a cold fit.")
+            previous_model = None
+
+    model, metrics, warm = None, None, False
+    warm_seconds, cold_seconds = None, None
+    if previous_model is not None:
+        # Started before the try so a warm attempt that raises is still counted
+        warm_start_time = time.perf_counter()
+        try:
+            candidate = _new_model(seasonality_mode)
+            candidate.fit(train_df, init=warm_start_params(previous_model))
+            warm_seconds = time.perf_counter() - warm_start_time
+            # Both checks compare against the last cold fit, not the previous (possibly warm)
+            # run, so successive warm fits cannot each slip by up to `drift_tolerance`.
+            reference_rmse = meta.get('reference_train_rmse')
+            if not _params_finite(candidate):
+                print("Warm-started fit has non-finite parameters. Falling back to a cold fit.")
+            elif reference_rmse is None:
+                print("No cold-fit reference to check the warm-started fit against. Falling back to a cold fit.")
+            elif train_rmse(candidate, train_df) > reference_rmse * (1 + drift_tolerance):
+                print("Warm-started fit stopped at a worse optimum than the cold fit. Falling back to a cold fit.")
+            else:
+                candidate_metrics = _evaluate(candidate)
+                reference_mae = meta.get('reference_mae')
+                drifted = (reference_mae is not None and candidate_metrics["MAE"] is not None
+                           and candidate_metrics["MAE"] > reference_mae * (1 + drift_tolerance))
+                if drifted:
+                    print("Warm-started fit drifted beyond tolerance. Falling back to a cold fit.")
+                else:
+                    model, metrics, warm = candidate, candidate_metrics, True
+        except Exception as e:
+            print(f"Warm-started fit failed ({e}). Falling back to a cold fit.")
+            if warm_seconds is None:
+                warm_seconds = time.perf_counter() - warm_start_time
+
+    if model is None:
+        model = _new_model(seasonality_mode)
+        cold_seconds = _fit_timed(model, train_df)
+        metrics = _evaluate(model)
+        meta['cold_fit_seconds'] = round(cold_seconds, 3)
+        meta['cold_fit_rows'] = len(train_df)
+        meta['reference_train_rmse'] = train_rmse(model, train_df)
+        # Keep the previous reference when this run has no test set to measure one
+        if metrics["MAE"] is not None:
+            meta['reference_mae'] = metrics["MAE"]
+
+    # 3. Fit-time report
+    fit_seconds = (warm_seconds or 0.0) + (cold_seconds or 0.0)
+    if warm:
+        last_cold = meta.get('cold_fit_seconds')
+        if last_cold:
+            print(f"Warm-started fit: {warm_seconds:.2f}s on {len(train_df)} rows vs last cold fit "
+                  f"{last_cold:.2f}s on {meta.get('cold_fit_rows', '?')} rows "
+                  f"(saved {last_cold - warm_seconds:.2f}s).")
+        else:
+            print(f"Warm-started fit: {warm_seconds:.2f}s.")
+    elif warm_seconds is not None:
+        print(f"Rejected warm-started fit: {warm_seconds:.2f}s + cold fit: {cold_seconds:.2f}s "
+              f"= {fit_seconds:.2f}s total.")
+    else:
+        print(f"Cold fit: {cold_seconds:.2f}s.")
+    metrics = {
+        **metrics,
+        "FIT_SECONDS": round(fit_seconds, 3),
+        "WARM_FIT_SECONDS": None if warm_seconds is None else round(warm_seconds, 3),
+        "COLD_FIT_SECONDS": None if cold_seconds is None else round(cold_seconds, 3),
+        "WARM_START": warm,
+    }
+
+    if model_dir:
+        meta.update({
+            'seasonality_mode': seasonality_mode,
+            'last_fit_seconds': round(fit_seconds, 3),
+            'metrics': {"MAE": metrics["MAE"], "RMSE": metrics["RMSE"]},
+        })
+        save_model(model, meta, model_dir, model_name)
     
     # 4. Out-of-Sample Forecasting
     future = model.make_future_dataframe(periods=forecast_days, freq='D')
@@ -67,7 +242,7 @@ def prophet_predict(df_ts, forecast_days, test_size_months, seasonality_mode='ad
     print("Forecasting complete.")
     return model, forecast, metrics
 
-# --- 3. Plotting Function (for Streamlit app.py) ---
+# --- 4. Plotting Function (for Streamlit app.py) ---
 
 def plot_forecast(model, forecast):
     """Generates a Plotly chart of the Prophet forecast with confidence intervals."""
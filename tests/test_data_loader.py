@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from src.data_loader import write_shared_dataset, load_shared_dataset
+
+
+def test_shared_dataset_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'Order Date': pd.to_datetime(['2020-01-01', '2020-02-01', '2020-03-01']),
+        'Region': ['East', 'West', 'East'],
+        'Sales': [1.5, 2.0, 3.25],
+        'Quantity': [1, 2, 3],
+    })
+    df['Month_Name'] = pd.Categorical(['Jan', 'Feb', 'Mar'], categories=['Jan', 'Feb', 'Mar'], ordered=True)
+    shared_path = tmp_path / "shared" / "superstore.feather"
+
+    # A filtered frame (non-default index) is written with a fresh RangeIndex
+    write_shared_dataset(df.iloc[1:], str(shared_path))
+    loaded = load_shared_dataset(str(shared_path))
+
+    expected = df.iloc[1:].reset_index(drop=True)
+    assert list(loaded.columns) == list(expected.columns)
+    assert loaded['Order Date'].dtype.kind == 'M'
+    assert loaded['Sales'].dtype == expected['Sales'].dtype
+    assert loaded['Quantity'].dtype == expected['Quantity'].dtype
+    assert isinstance(loaded['Month_Name'].dtype, pd.CategoricalDtype)
+    assert loaded['Month_Name'].cat.ordered
+    assert isinstance(loaded['Region'].dtype, pd.ArrowDtype)
+    assert loaded['Region'].tolist() == ['West', 'East']
+    assert loaded['Sales'].tolist() == expected['Sales'].tolist()
+    assert not list(shared_path.parent.glob("*.tmp"))
+
+
+def test_load_shared_dataset_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_shared_dataset(str(tmp_path / "missing.feather"))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from src.order_sketches import precision_for_error, build_order_sketches, estimate_distinct_orders
+
+
+def _orders(n_orders, n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Order Date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 365, n_rows), 'D'),
+        'Order ID': [f"O-{i}" for i in rng.integers(0, n_orders, n_rows)],
+        'Region': rng.choice(['East', 'West', 'South', 'Central'], n_rows),
+        'Category': rng.choice(['Furniture', 'Technology'], n_rows),
+    })
+
+
+def test_precision_for_error():
+    assert precision_for_error(0.02) == 12
+    assert precision_for_error(10) == 4
+
+
+def test_estimate_within_error_bound():
+    df = _orders(20_000, 50_000)
+    sketches = build_order_sketches(df, precision_for_error(0.02))
+
+    # 3 standard errors of the nominal 1.6% (p=12)
+    exact = df['Order ID'].nunique()
+    assert abs(estimate_distinct_orders(sketches) / exact - 1) < 0.05
+
+    subset = df[(df['Region'] == 'East') & (df['Order Date'] < '2020-07-01')]
+    estimate = estimate_distinct_orders(sketches, end_date='2020-07-01', Region=['East'])
+    assert abs(estimate / subset['Order ID'].nunique() - 1) < 0.05
+
+
+def test_small_and_empty_filters():
+    df = _orders(50, 200)
+    sketches = build_order_sketches(df, 12)
+    assert estimate_distinct_orders(sketches) == df['Order ID'].nunique()
+    assert estimate_distinct_orders(sketches, Region=['Nowhere']) == 0
@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("prophet")
+logging.getLogger("cmdstanpy").setLevel(logging.ERROR)
+
+from prophet import Prophet  # noqa: E402
+
+from src.sales_prediction import prophet_predict  # noqa: E402
+
+
+def _series(n_days=730, seed=0):
+    rng = np.random.default_rng(seed)
+    ds = pd.date_range('2018-01-01', periods=n_days, freq='D')
+    t = np.arange(n_days)
+    y = 1000 + 0.5 * t + 200 * np.sin(2 * np.pi * t / 365.25) + rng.normal(0, 30, n_days)
+    return pd.DataFrame({'ds': ds, 'y': y})
+
+
+def _run(df_ts, model_dir, test_size_months=3, **kwargs):
+    return prophet_predict(df_ts, forecast_days=7, test_size_months=test_size_months,
+                           model_dir=str(model_dir), warm_start=True, **kwargs)[2]
+
+
+def _meta(model_dir):
+    with open(os.path.join(model_dir, 'prophet_model_meta.json')) as f:
+        return json.load(f)
+
+
+def _edit_meta(model_dir, **changes):
+    meta = _meta(model_dir)
+    meta.update(changes)
+    with open(os.path.join(model_dir, 'prophet_model_meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def test_cold_then_warm_fit(tmp_path):
+    df_ts = _series()
+    cold = _run(df_ts.iloc[:-1], tmp_path)
+    assert cold['WARM_START'] is False
+    assert cold['WARM_FIT_SECONDS'] is None
+    assert cold['COLD_FIT_SECONDS'] == cold['FIT_SECONDS']
+    meta = _meta(tmp_path)
+    for key in ('cold_fit_seconds', 'cold_fit_rows', 'reference_mae', 'reference_train_rmse',
+                'seasonality_mode', 'last_fit_seconds', 'metrics'):
+        assert key in meta
+
+    warm = _run(df_ts, tmp_path)
+    assert warm['WARM_START'] is True
+    assert warm['COLD_FIT_SECONDS'] is None
+    assert warm['WARM_FIT_SECONDS'] == warm['FIT_SECONDS']
+    assert set(warm) == {'MAE', 'RMSE', 'FIT_SECONDS', 'WARM_FIT_SECONDS', 'COLD_FIT_SECONDS', 'WARM_START'}
+    # The drift reference stays that of the cold fit
+    assert _meta(tmp_path)['reference_mae'] == meta['reference_mae']
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_corrupt_model_file_falls_back_to_cold_fit(tmp_path):
+    df_ts = _series()
+    _run(df_ts.iloc[:-1], tmp_path)
+    with open(os.path.join(tmp_path, 'prophet_model.json'), 'w') as f:
+        f.write('{"truncated')
+
+    metrics = _run(df_ts, tmp_path)
+    assert metrics['WARM_START'] is False
+    assert metrics['WARM_FIT_SECONDS'] is None
+    # The rewritten file is usable again
+    assert _run(df_ts, tmp_path)['WARM_START'] is True
+
+
+def test_seasonality_mode_mismatch_uses_cold_fit(tmp_path):
+    df_ts = _series()
+    _run(df_ts.iloc[:-1], tmp_path)
+    metrics = _run(df_ts, tmp_path, seasonality_mode='multiplicative')
+    assert metrics['WARM_START'] is False
+    assert metrics['WARM_FIT_SECONDS'] is None
+    assert _meta(tmp_path)['seasonality_mode'] == 'multiplicative'
+
+
+def test_drift_beyond_tolerance_falls_back(tmp_path):
+    df_ts = _series()
+    _run(df_ts.iloc[:-1], tmp_path)
+    _edit_meta(tmp_path, reference_mae=1e-6)
+
+    metrics = _run(df_ts, tmp_path)
+    assert metrics['WARM_START'] is False
+    assert metrics['WARM_FIT_SECONDS'] is not None
+    assert metrics['FIT_SECONDS'] == pytest.approx(metrics['WARM_FIT_SECONDS'] + metrics['COLD_FIT_SECONDS'], abs=2e-3)
+    assert _meta(tmp_path)['reference_mae'] > 1e-6
+
+
+def test_missing_reference_rejects_warm_fit(tmp_path):
+    df_ts = _series()
+    _run(df_ts.iloc[:-1], tmp_path)
+    meta = _meta(tmp_path)
+    del meta['reference_train_rmse']
+    with open(os.path.join(tmp_path, 'prophet_model_meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    metrics = _run(df_ts, tmp_path)
+    assert metrics['WARM_START'] is False
+    assert metrics['COLD_FIT_SECONDS'] is not None
+
+
+def test_large_history_growth_uses_cold_fit(tmp_path):
+    df_ts = _series()
+    _run(df_ts.iloc[:200], tmp_path, test_size_months=0)
+    metrics = _run(df_ts, tmp_path, test_size_months=0)
+    assert metrics['WARM_START'] is False
+    assert metrics['WARM_FIT_SECONDS'] is None
+
+
+def test_warm_fit_exception_is_timed_and_falls_back(tmp_path, monkeypatch):
+    df_ts = _series()
+    _run(df_ts.iloc[:-1], tmp_path)
+
+    original_fit = Prophet.fit
+
+    def failing_warm_fit(self, df, **kwargs):
+        if 'init' in kwargs:
+            raise RuntimeError("optimizer failed")
+        return original_fit(self, df, **kwargs)
+
+    monkeypatch.setattr(Prophet, 'fit', failing_warm_fit)
+    metrics = _run(df_ts, tmp_path)
+    assert metrics['WARM_START'] is False
+    assert metrics['WARM_FIT_SECONDS'] is not None
+    assert metrics['COLD_FIT_SECONDS'] is not None
+
+
+def test_no_test_set_keeps_reference_mae(tmp_path):
+    df_ts = _series()
+    _run(df_ts.iloc[:-2], tmp_path)
+    reference_mae = _meta(tmp_path)['reference_mae']
+
+    metrics = _run(df_ts.iloc[:-1], tmp_path, test_size_months=0)
+    assert metrics['MAE'] is None
+    assert _meta(tmp_path)['reference_mae'] == reference_mae
+
+    # Even a rejected warm fit followed by a cold fit without a test set keeps it
+    _edit_meta(tmp_path, reference_train_rmse=1e-6)
+    metrics = _run(df_ts, tmp_path, test_size_months=0)
+    assert metrics['WARM_START'] is False
+    assert _meta(tmp_path)['reference_mae'] == reference_mae